@@ -0,0 +1,638 @@
+import copy
+import re
+import time
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Set
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # fall back to running the kernel as plain Python
+    njit = None
+
+# What step() reports
+CONTINUE, REJECT, ACCEPT = range(3)
+
+# ---------------- Run kernel ----------------
+
+# Why _run_kernel returned
+_HALT, _ACCEPT, _OFF_TAPE, _MAX_STEPS = range(4)
+
+
+def _run_kernel(tape, origin, head, state, next_state, write_sym, move,
+                final_mask, nS, max_steps):
+    steps = 0
+    while steps < max_steps:
+        if final_mask[state]:
+            return head, state, steps, _ACCEPT
+
+        h = head + origin
+        if h < 0 or h >= len(tape):
+            return head, state, steps, _OFF_TAPE
+
+        idx = state * nS + tape[h]
+        ns = next_state[idx]
+        if ns < 0:
+            return head, state, steps, _HALT
+
+        tape[h] = write_sym[idx]
+        state = ns
+        head += move[idx]
+        steps += 1
+    return head, state, steps, _MAX_STEPS
+
+
+if njit is not None:
+    _run_kernel = njit(cache=True)(_run_kernel)
+
+# ---------------- Loop detection ----------------
+
+_MASK64 = (1 << 64) - 1
+
+
+def _zobrist(sym: int, position: int) -> int:
+    # Pseudo-random 64-bit key for a symbol at a tape position (splitmix64);
+    # blanks hash to 0 so unwritten cells never affect the tape hash
+    if not sym:
+        return 0
+    z = (((position << 8) | sym) + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+class TuringMachine:
+    def __init__(
+        self,
+        states: Set[str],
+        input_symbols: Set[str],
+        tape_symbols: Set[str],
+        transitions: Dict[Tuple[str, str], Tuple[str, str, str]],
+        initial_state: str,
+        blank_symbol: str,
+        final_states: Set[str],
+        tape_input: str = ""
+    ):
+        self._compile_static(
+            states, input_symbols, tape_symbols, transitions,
+            initial_state, blank_symbol, final_states
+        )
+        self.reset(tape_input)
+
+    @classmethod
+    def from_spec(cls, machine: dict, tape_input: str = "", blank: str = '_') -> "TuringMachine":
+        # `machine` is a MACHINES entry: "alphabet", "tape", "transitions",
+        # "initial" and "final"; Q is every state the transitions mention
+        states = set(machine["final"]) | {machine["initial"]}
+        for (src, _), (dst, _, _) in machine["transitions"].items():
+            states.update((src, dst))
+        return cls(states, machine["alphabet"], machine["tape"], machine["transitions"],
+                   machine["initial"], blank, machine["final"], tape_input)
+
+    def fresh(self, tape_input: str = "") -> "TuringMachine":
+        # A new run of this machine: shares the compiled tables, but has its
+        # own tape, head, state, step count and undo history
+        tm = copy.copy(self)
+        tm.reset(tape_input)
+        return tm
+
+    def simulate(self, tape_input: str, max_steps: int = 10_000_000) -> Tuple[Optional[bool], str]:
+        # Runs tape_input on a fresh copy, leaving this machine untouched
+        tm = self.fresh(tape_input)
+        return tm.run_fast(max_steps), tm.state
+
+    # ---------------- Setup ----------------
+
+    def _compile_static(self, states, input_symbols, tape_symbols, transitions,
+                        initial_state, blank_symbol, final_states):
+        # The string definition is only kept for reference (and to recompile
+        # on new symbols); stepping uses the int tables built below
+        self.states = frozenset(states)
+        self.input_symbols = frozenset(input_symbols)
+        self.tape_symbols = frozenset(tape_symbols)
+        self.transitions = transitions
+        self.initial_state = initial_state
+        self.blank = blank_symbol
+        self.final_states = frozenset(final_states)
+
+        # Symbols are interned to small ints; the blank is always 0 so that
+        # freshly grown tape cells are blank
+        symbols = set(tape_symbols)
+        all_states = set(states) | set(final_states) | {initial_state}
+        for (src, sym), (dst, write_symbol, _) in transitions.items():
+            symbols.update((sym, write_symbol))
+            all_states.update((src, dst))
+        self._int2sym = [blank_symbol] + sorted(symbols - {blank_symbol})
+        self._sym2int = {s: i for i, s in enumerate(self._int2sym)}
+        # Maps input characters to symbol ids, to load the tape in one call
+        self._input_trans = str.maketrans(
+            {s: chr(i) for s, i in self._sym2int.items() if len(s) == 1}
+        )
+        # Turns a slice of the tape back into symbol characters in one call;
+        # only possible when every symbol is a single latin-1 character
+        self._trans = None
+        if all(len(s) == 1 and ord(s) < 256 for s in self._int2sym):
+            self._trans = bytes.maketrans(
+                bytes(range(len(self._int2sym))), "".join(self._int2sym).encode("latin1")
+            )
+        self._int2state = sorted(all_states)
+        self._state_id = {s: i for i, s in enumerate(self._int2state)}
+
+        # Transition table flattened into parallel arrays indexed by
+        # state_id * nS + symbol_id; a next state of -1 means "halt"
+        nQ = len(self._int2state)
+        nS = self._nS = len(self._int2sym)
+        self._next_state = array('i', [-1] * (nQ * nS))
+        self._write_sym = array('B', bytes(nQ * nS))
+        self._move = array('b', bytes(nQ * nS))
+        for (src, sym), (dst, write_symbol, direction) in transitions.items():
+            idx = self._state_id[src] * nS + self._sym2int[sym]
+            self._next_state[idx] = self._state_id[dst]
+            self._write_sym[idx] = self._sym2int[write_symbol]
+            self._move[idx] = 1 if direction == 'R' else -1 if direction == 'L' else 0
+
+        # One byte per state id, so the accept check is a single load
+        final_ids = {self._state_id[s] for s in final_states}
+        self._final_mask = bytes(1 if q in final_ids else 0 for q in range(nQ))
+
+        # (q, x) -> (q, x, R) self-loops only move the head right; per state,
+        # a pattern matching the first cell that ends such a run. The blank
+        # is never skipped, so every scan stops at the end of the data.
+        self._skip = [None] * nQ
+        for q in range(nQ):
+            run = bytes(
+                x for x in range(1, nS)
+                if self._next_state[q * nS + x] == q
+                and self._write_sym[q * nS + x] == x
+                and self._move[q * nS + x] == 1
+            )
+            if run:
+                self._skip[q] = re.compile(b"[^" + re.escape(run) + b"]")
+
+        self._initial_i = self._state_id[initial_state]
+
+        # Built lazily by _specialize()
+        self._specialized = None
+
+    def reset(self, tape_input: str = ""):
+        # Symbols outside the tape alphabet have no transitions, so the
+        # machine simply halts on them; they still need an id to be stored
+        unknown = set(tape_input) - self._sym2int.keys()
+        if unknown:
+            self._compile_static(
+                self.states, self.input_symbols, set(self.tape_symbols) | unknown,
+                self.transitions, self.initial_state, self.blank, self.final_states
+            )
+
+        self._state_i = self._initial_i
+
+        # Infinite tape using a bytearray grown on demand; cell i is stored
+        # at index i + origin
+        self.tape = bytearray(max(64, len(tape_input) * 2))
+        self.origin = len(self.tape) // 4
+        self.tape[self.origin:self.origin + len(tape_input)] = (
+            tape_input.translate(self._input_trans).encode("latin1")
+        )
+
+        self.head = 0
+        self.step_count = 0
+        self.halted = False
+        self.accepted = False
+
+        # Undo only reaches back this many steps (a new deque, since copies
+        # made by fresh() start out sharing this one)
+        self.history = deque(maxlen=1024)
+
+        # Leftmost/rightmost non-blank cells ever written; these only widen
+        # (a blanked extreme is not noticed), which is fine for display
+        self._min_idx = 0
+        self._max_idx = max(len(tape_input) - 1, 0)
+
+    @property
+    def state(self) -> str:
+        return self._int2state[self._state_i]
+
+    @state.setter
+    def state(self, name: str):
+        self._state_i = self._state_id[name]
+
+    # ---------------- Tape operations ----------------
+
+    def read(self, position: int) -> str:
+        i = position + self.origin
+        if 0 <= i < len(self.tape):
+            return self._int2sym[self.tape[i]]
+        return self.blank
+
+    def write(self, position: int, symbol: str):
+        self._ensure(position)
+        self.tape[position + self.origin] = self._sym2int[symbol]
+        if symbol != self.blank:
+            if position < self._min_idx:
+                self._min_idx = position
+            elif position > self._max_idx:
+                self._max_idx = position
+
+    def read_window(self, start: int, n: int) -> List[str]:
+        # Symbols of cells start..start+n-1 from one slice of the tape,
+        # padded with blanks wherever the window runs past it
+        lo, hi = start + self.origin, start + self.origin + n
+        cells = (
+            bytes(min(n, max(0, -lo)))
+            + self.tape[max(0, lo):max(0, hi)]
+            + bytes(min(n, max(0, hi - max(lo, len(self.tape)))))
+        )
+        if self._trans is not None:
+            return list(cells.translate(self._trans).decode("latin1"))
+        return [self._int2sym[c] for c in cells]
+
+    def _ensure(self, position: int):
+        # Double the tape on whichever side `position` falls off
+        i = position + self.origin
+        if i < 0:
+            grow = max(len(self.tape), -i)
+            self.tape = bytearray(grow) + self.tape
+            self.origin += grow
+        elif i >= len(self.tape):
+            self.tape.extend(bytearray(max(len(self.tape), i - len(self.tape) + 1)))
+
+    def _rescan_bounds(self):
+        # Exact non-blank extremes (0, 0 on an empty tape), for when cells
+        # were written without updating the marks
+        right = len(self.tape.rstrip(b"\x00")) - 1
+        if right < 0:
+            self._min_idx = self._max_idx = 0
+            return
+        left = len(self.tape) - len(self.tape.lstrip(b"\x00"))
+        self._min_idx, self._max_idx = left - self.origin, right - self.origin
+
+    # ---------------- Visualization ----------------
+
+    def visualize(self, window: int = 6):
+        min_index, max_index = self._min_idx, self._max_idx
+
+        left = min(min_index, self.head) - window
+        right = max(max_index, self.head) + window
+
+        tape_line = " ".join(self.read_window(left, right - left + 1)) + " "
+        head_line = "  " * (self.head - left) + "↑ " + "  " * (right - self.head)
+
+        print(f"Step: {self.step_count}")
+        print(f"State: {self.state}")
+        print("Tape :", tape_line)
+        print("       ", head_line)
+        print("-" * 50)
+
+    # ---------------- One step ----------------
+
+    def step(self) -> int:
+        if self.halted:
+            return ACCEPT if self.accepted else REJECT
+        if self._final_mask[self._state_i]:
+            self.halted = self.accepted = True
+            return ACCEPT
+
+        # The head is always kept inside the allocated tape
+        i = self.head + self.origin
+        idx = self._state_i * self._nS + self.tape[i]
+
+        # A step changes one cell plus a few scalars, so record only those
+        self.history.append((
+            self._state_i, self.head, self.tape[i],
+            self.step_count, self.halted, self.accepted
+        ))
+
+        new_state = self._next_state[idx]
+        if new_state < 0:
+            self.halted = True
+            return REJECT
+
+        sym = self.tape[i] = self._write_sym[idx]
+        if sym:
+            if self.head < self._min_idx:
+                self._min_idx = self.head
+            elif self.head > self._max_idx:
+                self._max_idx = self.head
+        self._state_i = new_state
+        self.head += self._move[idx]
+        self._ensure(self.head)
+
+        self.step_count += 1
+        if self._final_mask[new_state]:
+            self.halted = self.accepted = True
+            return ACCEPT
+        return CONTINUE
+
+    def undo(self):
+        if self.history:
+            (self._state_i, self.head, sym,
+             self.step_count, self.halted, self.accepted) = self.history.pop()
+            # The tape only ever grows, so the old head is still on it
+            self.tape[self.head + self.origin] = sym
+
+    # ---------------- Run machine ----------------
+
+    def run(self, delay: float = 0.7, verbose_every: int = 1, detect_loops: bool = False):
+        print("\nInitial configuration")
+        self.visualize()
+        time.sleep(delay)
+
+        # The loop body is step() inlined over locals; they are written back
+        # to self only to grow the tape, render, or finish
+        tape, origin = self.tape, self.origin
+        head, state, steps = self.head, self._state_i, self.step_count
+        ns_tab, w_tab, m_tab = self._next_state, self._write_sym, self._move
+        fm, nS = self._final_mask, self._nS
+        lo, hi = self._min_idx, self._max_idx
+        # Runs of self-loops are only skipped when not every step is shown
+        skip_tab = self._skip if verbose_every > 1 else [None] * len(fm)
+        shown = steps
+
+        # Zobrist hash of the tape, updated by XOR as cells change
+        if detect_loops:
+            seen = set()
+            tape_hash = 0
+            for i, sym in enumerate(tape):
+                tape_hash ^= _zobrist(sym, i - origin)
+
+        # Runs don't record undo deltas
+        self.history.clear()
+
+        while True:
+            if fm[state]:
+                result = "✅ ACCEPTED"
+                self.halted = self.accepted = True
+                break
+
+            if detect_loops:
+                config = (tape_hash, state, head)
+                if config in seen:
+                    result = "🔁 LOOP DETECTED"
+                    break
+                seen.add(config)
+
+            i = head + origin
+            end = i
+            skip = skip_tab[state]
+            if skip is not None:
+                match = skip.search(tape, i)
+                end = match.start() if match else len(tape)
+
+            if end > i:
+                # Jump over a whole run of self-loops in one scan
+                head += end - i
+                steps += end - i
+            else:
+                idx = state * nS + tape[i]
+                nxt = ns_tab[idx]
+                if nxt < 0:
+                    result = "❌ REJECTED"
+                    self.halted = True
+                    break
+
+                sym = w_tab[idx]
+                if detect_loops and sym != tape[i]:
+                    tape_hash ^= _zobrist(tape[i], head) ^ _zobrist(sym, head)
+                tape[i] = sym
+                if sym:
+                    if head < lo:
+                        lo = head
+                    elif head > hi:
+                        hi = head
+                state = nxt
+                head += m_tab[idx]
+                steps += 1
+
+            if not 0 <= head + origin < len(tape):
+                self.head = head
+                self._ensure(head)
+                tape, origin = self.tape, self.origin
+
+            # Only render once per `verbose_every` steps
+            if steps // verbose_every != shown // verbose_every:
+                self.head, self._state_i, self.step_count = head, state, steps
+                self._min_idx, self._max_idx = lo, hi
+                self.visualize()
+                time.sleep(delay)
+                shown = steps
+
+        self.head, self._state_i, self.step_count = head, state, steps
+        self._min_idx, self._max_idx = lo, hi
+
+        # Always show the configuration the machine halted in
+        if steps != shown:
+            self.visualize()
+        print(result)
+
+    # ---------------- Run machine (no output) ----------------
+
+    def _specialize(self):
+        # Generates the run loop for this machine's transitions as straight
+        # if/elif chains, so pure-Python runs do no table lookups at all.
+        # Same signature and results as _run_kernel minus the tables.
+        if self._specialized is not None:
+            return self._specialized
+
+        nS = self._nS
+        lines = [
+            "def run(tape, origin, head, state, max_steps):",
+            "    steps = 0",
+            "    n = len(tape)",
+            "    while steps < max_steps:",
+            "        h = head + origin",
+            "        if h < 0 or h >= n:",
+            f"            return head, state, steps, {_OFF_TAPE}",
+            "        sym = tape[h]",
+        ]
+        for q in range(len(self._final_mask)):
+            lines.append(f"        {'if' if q == 0 else 'elif'} state == {q}:")
+            if self._final_mask[q]:
+                lines.append(f"            return head, state, steps, {_ACCEPT}")
+                continue
+
+            keyword = "if"
+            for x in range(nS):
+                idx = q * nS + x
+                ns = self._next_state[idx]
+                if ns < 0:
+                    continue
+                lines.append(f"            {keyword} sym == {x}:")
+                keyword = "elif"
+                if self._write_sym[idx] != x:
+                    lines.append(f"                tape[h] = {self._write_sym[idx]}")
+                if self._move[idx]:
+                    lines.append(f"                head += {self._move[idx]}")
+                lines.append(f"                state = {ns}")
+            if keyword == "elif":
+                lines += ["            else:", f"                return head, state, steps, {_HALT}"]
+            else:
+                lines.append(f"            return head, state, steps, {_HALT}")
+        lines += [
+            "        steps += 1",
+            f"    return head, state, steps, {_MAX_STEPS}",
+        ]
+
+        ns = {}
+        exec(compile("\n".join(lines), "<turing machine>", "exec"), ns)
+        self._specialized = ns["run"]
+        return self._specialized
+
+    def run_fast(self, max_steps: int = 10_000_000) -> Optional[bool]:
+        # True if accepted, False if halted otherwise, None if max_steps ran out
+        # Numba runs the generic kernel; plain Python runs generated code
+        if njit is not None:
+            tables = tuple(
+                np.asarray(memoryview(t))
+                for t in (self._next_state, self._write_sym, self._move, self._final_mask)
+            )
+        else:
+            run = self._specialize()
+
+        # Runs don't record undo deltas
+        self.history.clear()
+
+        remaining = max_steps
+        while True:
+            if njit is not None:
+                # The numpy view must be dropped before the tape can grow
+                tape = np.frombuffer(self.tape, dtype=np.uint8)
+                self.head, self._state_i, steps, reason = _run_kernel(
+                    tape, self.origin, self.head, self._state_i, *tables,
+                    self._nS, remaining
+                )
+                del tape
+            else:
+                self.head, self._state_i, steps, reason = run(
+                    self.tape, self.origin, self.head, self._state_i, remaining
+                )
+            self._ensure(self.head)
+            self.step_count += steps
+            remaining -= steps
+            if reason != _OFF_TAPE:
+                self._rescan_bounds()
+
+            if reason == _ACCEPT:
+                self.halted = self.accepted = True
+                return True
+            if reason == _HALT:
+                self.halted = True
+                return False
+            if reason == _MAX_STEPS:
+                return None
+
+    def run_n(self, n: int) -> int:
+        # Up to n transitions through run_fast(), then reports like step(),
+        # so a caller can redraw between batches without a call per step
+        if not self.halted and self.run_fast(n) is None and self._final_mask[self._state_i]:
+            # The budget ran out right as the machine entered a final state
+            self.halted = self.accepted = True
+        if self.halted:
+            return ACCEPT if self.accepted else REJECT
+        return CONTINUE
+
+    # ---------------- Run many inputs ----------------
+
+    @classmethod
+    def run_batch(
+        cls, machine: dict, inputs: List[str], max_steps: int = 100_000, blank: str = '_'
+    ) -> List[Optional[bool]]:
+        # Same results as run_fast() on each input; `machine` is a spec dict
+        # with "alphabet", "tape", "transitions", "initial" and "final"
+        # Input characters outside the tape alphabet get ids too (and halt)
+        tape_symbols = set(machine["tape"]).union(*inputs)
+        tm = cls.from_spec(dict(machine, tape=tape_symbols), blank=blank)
+        if np is None:
+            return [tm.simulate(s, max_steps)[0] for s in inputs]
+
+        next_state = np.asarray(memoryview(tm._next_state))
+        write_sym = np.asarray(memoryview(tm._write_sym))
+        move = np.asarray(memoryview(tm._move))
+        final_mask = np.asarray(memoryview(tm._final_mask))
+        nS = tm._nS
+
+        # One tape row per input, all advanced together one step at a time
+        B = len(inputs)
+        L = max(map(len, inputs), default=0)
+        origin = max(64, L)
+        tapes = np.zeros((B, L + 2 * origin), dtype=np.uint8)
+        for b, s in enumerate(inputs):
+            tapes[b, origin:origin + len(s)] = np.frombuffer(
+                s.translate(tm._input_trans).encode("latin1"), dtype=np.uint8
+            )
+
+        rows = np.arange(B)
+        heads = np.full(B, origin, dtype=np.intp)
+        states = np.full(B, tm._state_i, dtype=np.intp)
+        result = np.full(B, -1, dtype=np.int8)  # -1 running, 0 halted, 1 accepted
+
+        for _ in range(max_steps):
+            running = result < 0
+            accept = running & (final_mask[states] != 0)
+            result[accept] = 1
+            running &= ~accept
+
+            idx = states * nS + tapes[rows, heads]
+            ns = np.take(next_state, idx)
+            halt = running & (ns < 0)
+            result[halt] = 0
+            running &= ~halt
+
+            r = rows[running]
+            if not r.size:
+                break
+            i = idx[r]
+            tapes[r, heads[r]] = np.take(write_sym, i)
+            states[r] = ns[r]
+            heads[r] += np.take(move, i)
+
+            # Double the tapes once any head reaches an edge
+            if heads[r].min() == 0 or heads[r].max() == tapes.shape[1] - 1:
+                grow = tapes.shape[1]
+                tapes = np.pad(tapes, ((0, 0), (grow, grow)))
+                heads += grow
+
+        return [None if x < 0 else bool(x) for x in result]
+
+# ==================================================
+# TURING MACHINES
+# ==================================================
+MACHINES = {
+    "Even number of 1s": {
+        "initial": "q_even",
+        "final": {"q_accept"},
+        "alphabet": {"0","1"},
+        "tape": {"0","1","_"},
+        "transitions": {
+            ('q_even','1'):('q_odd','1','R'),
+            ('q_even','0'):('q_even','0','R'),
+            ('q_even','_'):('q_accept','_','N'),
+            ('q_odd','1'):('q_even','1','R'),
+            ('q_odd','0'):('q_odd','0','R'),
+            ('q_odd','_'):('q_reject','_','N'),
+        }
+    },
+
+    "a^n b^n": {
+        "initial": "q0",
+        "final": {"q_accept"},
+        "alphabet": {"a","b"},
+        "tape": {"a","b","X","Y","_"},
+        "transitions": {
+            ('q0','a'):('q1','X','R'),
+            ('q0','Y'):('q0','Y','R'),
+            ('q0','_'):('q_accept','_','N'),
+
+            ('q1','a'):('q1','a','R'),
+            ('q1','Y'):('q1','Y','R'),
+            ('q1','b'):('q2','Y','L'),
+
+            ('q2','a'):('q2','a','L'),
+            ('q2','Y'):('q2','Y','L'),
+            ('q2','X'):('q0','X','R'),
+        }
+    }
+}
@@ -1,116 +1,73 @@
 import tkinter as tk
-import copy
 import math
+import statistics
+import time
+from collections import deque
+from functools import lru_cache
+
+from turing_core import MACHINES, TuringMachine
 
 # ==================================================
-# TURING MACHINE CORE (WITH UNDO)
+# STYLE
 # ==================================================
-class TuringMachine:
-    def __init__(self, transitions, initial_state, final_states, blank):
-        self.transitions = transitions
-        self.initial_state = initial_state
-        self.final_states = final_states
-        self.blank = blank
-        self.history = []
-        self.reset("")
-
-    def snapshot(self):
-        return copy.deepcopy((
-            self.state, self.tape, self.head,
-            self.steps, self.halted, self.accepted
-        ))
-
-    def restore(self, snap):
-        (self.state, self.tape, self.head,
-         self.steps, self.halted, self.accepted) = snap
-
-    def reset(self, tape_input):
-        self.state = self.initial_state
-        self.tape = {i: c for i, c in enumerate(tape_input)}
-        self.head = 0
-        self.steps = 0
-        self.halted = False
-        self.accepted = False
-        self.history.clear()
-
-    def read(self):
-        return self.tape.get(self.head, self.blank)
-
-    def write(self, sym):
-        if sym == self.blank:
-            self.tape.pop(self.head, None)
-        else:
-            self.tape[self.head] = sym
-
-    def step(self):
-        if self.halted:
-            return False
-
-        self.history.append(self.snapshot())
-        key = (self.state, self.read())
-        if key not in self.transitions:
-            self.halted = True
-            self.accepted = self.state in self.final_states
-            return False
-
-        ns, w, mv = self.transitions[key]
-        self.write(w)
-        self.state = ns
-
-        if mv == 'R': self.head += 1
-        elif mv == 'L': self.head -= 1
-
-        self.steps += 1
-
-        if self.state in self.final_states:
-            self.halted = True
-            self.accepted = True
-
-        return True
-
-    def undo(self):
-        if self.history:
-            self.restore(self.history.pop())
+# Shared by every item that uses them, instead of a new tuple per call
+FONT_INFO = ("Arial",14)
+FONT_TAPE = ("Arial",16)
+FONT_FORMAL = ("Courier",11)
+FONT_STATE = ("Arial",12,"bold")
+FONT_LABEL = ("Arial",10,"italic")
+
+FILL_CELL = "white"
+FILL_HEAD = "lightblue"
+FILL_STATE = "white"
+FILL_FINAL = "lightgreen"
+FILL_ACTIVE = "yellow"
+EDGE_COLOR = "blue"
 
 # ==================================================
-# TURING MACHINES
+# DIAGRAM LAYOUT
 # ==================================================
-MACHINES = {
-    "Even number of 1s": {
-        "initial": "q_even",
-        "final": {"q_accept"},
-        "alphabet": {"0","1"},
-        "tape": {"0","1","_"},
-        "transitions": {
-            ('q_even','1'):('q_odd','1','R'),
-            ('q_even','0'):('q_even','0','R'),
-            ('q_even','_'):('q_accept','_','N'),
-            ('q_odd','1'):('q_even','1','R'),
-            ('q_odd','0'):('q_odd','0','R'),
-            ('q_odd','_'):('q_reject','_','N'),
-        }
-    },
-
-    "a^n b^n": {
-        "initial": "q0",
-        "final": {"q_accept"},
-        "alphabet": {"a","b"},
-        "tape": {"a","b","X","Y","_"},
-        "transitions": {
-            ('q0','a'):('q1','X','R'),
-            ('q0','Y'):('q0','Y','R'),
-            ('q0','_'):('q_accept','_','N'),
-
-            ('q1','a'):('q1','a','R'),
-            ('q1','Y'):('q1','Y','R'),
-            ('q1','b'):('q2','Y','L'),
-
-            ('q2','a'):('q2','a','L'),
-            ('q2','Y'):('q2','Y','L'),
-            ('q2','X'):('q0','X','R'),
-        }
-    }
-}
+STATE_RADIUS = 40
+
+@lru_cache(maxsize=32)
+def circle_layout(states, width, height, radius):
+    # States evenly spaced on a circle centred in the canvas; memoized, so
+    # switching back to a machine at the same size skips the trigonometry
+    n = len(states)
+
+    # Center in canvas
+    center_x = width / 2
+    center_y = height / 2
+
+    # Dynamically calculate spacing based on number of states and canvas size
+    spacing = min(width, height) / 2 - 2*radius - 20  # leave margin
+
+    coords = {}
+    for i, s in enumerate(states):
+        angle = 2*math.pi*i/n
+        coords[s] = (center_x + spacing*math.cos(angle), center_y + spacing*math.sin(angle))
+    return coords
+
+def edge_geometry(p1, p2, radius):
+    # Arrow from the edge of one state's circle to the other's, and the
+    # label point just off its middle; None when the centres coincide
+    x1, y1 = p1
+    x2, y2 = p2
+
+    dx = x2 - x1
+    dy = y2 - y1
+    dist = math.hypot(dx, dy)
+    if dist == 0:
+        return None
+
+    # Points on circle edge and label mid-point
+    inv = radius / dist
+    x_start = x1 + dx*inv
+    y_start = y1 + dy*inv
+    x_end = x2 - dx*inv
+    y_end = y2 - dy*inv
+    mx, my = (x_start + x_end)/2 - dy*0.1, (y_start + y_end)/2 + dx*0.1
+    return x_start, y_start, x_end, y_end, mx, my
 
 # ==================================================
 # GUI
@@ -149,44 +106,65 @@ class GUI:
         speed_frame.pack(pady=5)
         tk.Label(speed_frame,text="Speed:").pack(side=tk.LEFT)
         self.speed_var = tk.DoubleVar(value=0.6)
-        self.speed_slider = tk.Scale(speed_frame, from_=0.1, to=2.0, resolution=0.1,
+        self.speed_slider = tk.Scale(speed_frame, from_=0.0, to=2.0, resolution=0.1,
                                      orient=tk.HORIZONTAL, variable=self.speed_var, length=200)
         self.speed_slider.pack(side=tk.LEFT)
 
+        # Cost and start time of recent run frames, for pacing and the FPS readout
+        self.frame_costs = deque(maxlen=30)
+        self.frame_starts = deque(maxlen=30)
+        # Pending after() id of the run loop, so there is only ever one
+        self._run_job = None
+
         # Info label
-        self.info = tk.Label(left_frame,font=("Arial",14))
+        self.info = tk.Label(left_frame,font=FONT_INFO)
         self.info.pack(pady=10)
 
         # Tape canvas
         self.tape = tk.Canvas(left_frame,height=140,bg="white")
         self.tape.pack(fill=tk.X, pady=5)
+        # The window is centred on the head, so only the texts ever change
+        self.tape_cells = []
+        for i in range(13):
+            x = i*60+100
+            self.tape_cells.append((
+                self.tape.create_rectangle(x,40,x+50,90,fill=FILL_HEAD if i==6 else FILL_CELL),
+                self.tape.create_text(x+25,65,text="_",font=FONT_TAPE)
+            ))
+        self.last_tape = ["_"]*13
 
         # Formal description
-        self.formal = tk.Text(left_frame,height=10,font=("Courier",11))
+        self.formal = tk.Text(left_frame,height=10,font=FONT_FORMAL)
         self.formal.pack(fill=tk.X, pady=5)
+        self._last_formal = None
 
         # Right side: diagram
         right_frame = tk.Frame(main_frame)
         right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.diagram = tk.Canvas(right_frame,bg="white")
         self.diagram.pack(fill=tk.BOTH, expand=True)
+        self.diag_size = None
+        self.diagram.bind("<Configure>", self.on_diagram_resize)
 
-        # Load machine
+        # Load machine; resizes only move its diagram, so paint it here
+        self._dirty = True
         self.load_machine()
+        self.draw()
 
     # ---------- Machine ----------
     def load_machine(self):
         m = MACHINES[self.machine_name.get()]
-        self.tm = TuringMachine(
-            m["transitions"], m["initial"], m["final"], "_"
-        )
+        self.tm = TuringMachine.from_spec(m)
 
-        # Formal description
-        all_states = set([s for s,_ in m["transitions"].keys()])
-        all_states.update([dst for _,dst,_ in m["transitions"].values()])
-        all_states.update(m["final"])
-        self.formal.delete(1.0,tk.END)
-        self.formal.insert(tk.END,
+        # All states, in one pass over the transitions; the diagram uses them too
+        all_states = set(m["final"])
+        for (src, _), (dst, _, _) in m["transitions"].items():
+            all_states.add(src)
+            all_states.add(dst)
+        self._all_states = all_states
+
+        # Formal description, only rewritten when it actually changed
+        formal = (
             f"Q = {all_states}\n"
             f"Σ = {m['alphabet']}\n"
             f"Γ = {m['tape']}\n"
@@ -194,81 +172,95 @@ class GUI:
             f"F = {m['final']}\n"
             f"δ defined for {len(m['transitions'])} transitions\n"
         )
+        if formal != self._last_formal:
+            self.formal.delete(1.0,tk.END)
+            self.formal.insert(tk.END, formal)
+            self._last_formal = formal
 
-        # Prepare diagram layout
+        # Diagram geometry only; the next draw() paints it
         self.state_coords = {}
-        self.prepare_diagram(m)
+        self.prepare_diagram(m, all_states)
+        self.last_state = None
+        self._dirty = True
 
     # ---------- Diagram ----------
-    def prepare_diagram(self, machine):
+    def prepare_diagram(self, machine, all_states):
         self.diagram.delete("all")
-
-        # Include all states
-        all_states = set()
-        for (src, _), (dst, _, _) in machine["transitions"].items():
-            all_states.add(src)
-            all_states.add(dst)
-        all_states.update(machine["final"])
-        states = list(all_states)
-
-        n = len(states)
-        radius = 40
-
-        # Force update canvas to get actual size
-        self.diagram.update()
-        width = self.diagram.winfo_width()
-        height = self.diagram.winfo_height()
-
-        # Center in canvas
-        center_x = width / 2
-        center_y = height / 2
-
-        # Dynamically calculate spacing based on number of states and canvas size
-        spacing = min(width, height) / 2 - 2*radius - 20  # leave margin
-
-        self.state_coords = {}
-        for i, s in enumerate(states):
-            angle = 2*math.pi*i/n
-            x = center_x + spacing*math.cos(angle)
-            y = center_y + spacing*math.sin(angle)
-            self.state_coords[s] = (x, y)
+        radius = STATE_RADIUS
+
+        # Canvas size from the last <Configure>; before the first one, only
+        # let pending geometry settle instead of processing every event
+        if self.diag_size is None:
+            self.diagram.update_idletasks()
+            self.diag_size = (self.diagram.winfo_width(), self.diagram.winfo_height())
+        width, height = self.diag_size
+
+        # Sorted, so the same machine always gets the same layout (and key)
+        self.state_coords = dict(circle_layout(tuple(sorted(all_states)), width, height, radius))
+        self.state_ovals = {}
+        for s, (x, y) in self.state_coords.items():
+            # Everything drawn around a state is tagged "s:<state>" so a
+            # relayout can move it as one piece
+            group = "s:" + s
 
             # Final state double circle
             if s in machine["final"]:
                 self.diagram.create_oval(x-radius-5, y-radius-5, x+radius+5, y+radius+5,
-                                        outline="black", width=2)
-            # Main circle
-            self.diagram.create_oval(x-radius, y-radius, x+radius, y+radius, fill="white",
-                                    outline="black", width=2, tags=("state", s))
-            self.diagram.create_text(x, y, text=s, font=("Arial",12,"bold"))
+                                        outline="black", width=2, tags=(group,))
+            # Main circle, filled in by draw()
+            self.state_ovals[s] = self.diagram.create_oval(
+                x-radius, y-radius, x+radius, y+radius,
+                outline="black", width=2, tags=("state", s, group))
+            self.diagram.create_text(x, y, text=s, font=FONT_STATE, tags=(group,))
+
+        # One arrow and one label per (src, dst) pair, listing all its symbols
+        edges = {}
+        for (src, sym), (dst, _, _) in machine["transitions"].items():
+            edges.setdefault((src, dst), []).append(sym)
 
         # Draw transitions connecting circle edges
-        for (src, sym), (dst, _, _) in machine["transitions"].items():
+        self.edge_items = {}
+        for (src, dst), syms in edges.items():
+            label = ",".join(syms)
             x1, y1 = self.state_coords[src]
-            x2, y2 = self.state_coords[dst]
-
-            dx = x2 - x1
-            dy = y2 - y1
-            dist = (dx**2 + dy**2)**0.5
-            if dist == 0:
+            geom = edge_geometry(self.state_coords[src], self.state_coords[dst], radius)
+            if geom is None:
                 # self-loop
                 self.diagram.create_arc(x1-30, y1-50, x1+30, y1-10, start=0, extent=300,
-                                        style=tk.ARC, width=2, outline="blue")
-                self.diagram.create_text(x1, y1-55, text=sym, font=("Arial",10,"italic"))
+                                        style=tk.ARC, width=2, outline=EDGE_COLOR, tags=("s:" + src,))
+                self.diagram.create_text(x1, y1-55, text=label, font=FONT_LABEL,
+                                         tags=("s:" + src,))
                 continue
 
-            # Points on circle edge
-            x_start = x1 + dx*radius/dist
-            y_start = y1 + dy*radius/dist
-            x_end = x2 - dx*radius/dist
-            y_end = y2 - dy*radius/dist
+            x_start, y_start, x_end, y_end, mx, my = geom
+            self.edge_items[(src, dst)] = (
+                self.diagram.create_line(x_start, y_start, x_end, y_end, arrow=tk.LAST,
+                                        width=2, fill=EDGE_COLOR),
+                self.diagram.create_text(mx, my, text=label, font=FONT_LABEL)
+            )
 
-            # Draw line
-            self.diagram.create_line(x_start, y_start, x_end, y_end, arrow=tk.LAST,
-                                    width=2, fill="blue")
-            # Label mid-point
-            mx, my = (x_start + x_end)/2 - dy*0.1, (y_start + y_end)/2 + dx*0.1
-            self.diagram.create_text(mx, my, text=sym, font=("Arial",10,"italic"))
+    def relayout_diagram(self):
+        # Same layout as prepare_diagram() for the current size, reached by
+        # moving the existing items instead of recreating them
+        radius = STATE_RADIUS
+        coords = circle_layout(tuple(sorted(self._all_states)), *self.diag_size, radius)
+        for s, (x, y) in coords.items():
+            old_x, old_y = self.state_coords[s]
+            self.diagram.move("s:" + s, x - old_x, y - old_y)
+        self.state_coords = dict(coords)
+
+        for (src, dst), (line, text) in self.edge_items.items():
+            geom = edge_geometry(coords[src], coords[dst], radius)
+            if geom is None:
+                continue
+            self.diagram.coords(line, *geom[:4])
+            self.diagram.coords(text, *geom[4:])
+
+    def on_diagram_resize(self, event):
+        size = (event.width, event.height)
+        if size != self.diag_size:
+            self.diag_size = size
+            self.relayout_diagram()
 
     # ---------- Controls ----------
     def change_machine(self,*_):
@@ -276,35 +268,86 @@ class GUI:
         self.reset()
 
     def reset(self):
+        self.cancel_run()
         self.tm.reset(self.input.get())
+        self.frame_starts.clear()
+        self._dirty = True
         self.draw()
 
+    # Stepping a halted machine or undoing with no history changes nothing,
+    # so those leave the display clean and draw() returns straight away
     def step(self):
-        self.tm.step()
+        if not self.tm.halted:
+            self.tm.step()
+            self._dirty = True
         self.draw()
 
     def undo(self):
-        self.tm.undo()
+        if self.tm.history:
+            self.tm.undo()
+            self._dirty = True
         self.draw()
 
+    def cancel_run(self):
+        if self._run_job is not None:
+            self.root.after_cancel(self._run_job)
+            self._run_job = None
+
     def run(self):
+        # Pressing Run mid-run restarts the loop rather than adding another
+        self.cancel_run()
         if not self.tm.halted:
-            self.tm.step()
+            t0 = time.perf_counter()
+
+            # Below 50ms per step, do several steps per redraw instead of
+            # being capped by the timer; each goes through step() so the
+            # whole run stays undoable
+            delay = self.speed_var.get()
+            batch = 1 if delay > 0.05 else int(0.05 / max(delay, 1e-4))
+            for _ in range(batch):
+                if self.tm.halted:
+                    break
+                self.tm.step()
+            self._dirty = True
             self.draw()
-            delay = int(self.speed_var.get() * 1000)
-            self.root.after(delay, self.run)
+            # Flush the redraw before timing it, so a frame's cost includes
+            # it and the next frame is only queued once this one is painted
+            self.root.update_idletasks()
+
+            cost = (time.perf_counter() - t0) * 1000
+            self.frame_costs.append(cost)
+            self.frame_starts.append(t0)
+            if len(self.frame_starts) > 1 and not self.tm.halted:
+                fps = (len(self.frame_starts) - 1) / (self.frame_starts[-1] - self.frame_starts[0])
+                self.info.config(text=f"{self.info.cget('text')} | {fps:.1f} fps")
+
+            # The run ends on the frame that halted the machine
+            if self.tm.halted:
+                return
+
+            # Wait out the rest of the frame, net of what a frame typically
+            # costs, so the realized rate matches the slider; a frame that
+            # already overran goes again right away instead of falling behind
+            target = max(16, delay * 1000)
+            if cost > target:
+                wait = 1
+            else:
+                wait = max(1, int(target - statistics.median(self.frame_costs)))
+            self._run_job = self.root.after(wait, self.run)
 
     # ---------- Drawing ----------
     def draw(self):
-        # Tape
-        self.tape.delete("all")
-        start = self.tm.head - 6
-        for i in range(start,start+13):
-            x = (i-start)*60+100
-            s = self.tm.tape.get(i,'_')
-            c = "lightblue" if i==self.tm.head else "white"
-            self.tape.create_rectangle(x,40,x+50,90,fill=c)
-            self.tape.create_text(x+25,65,text=s,font=("Arial",16))
+        # Nothing changed since the last draw
+        if not self._dirty:
+            return
+
+        # Tape: only cells whose symbol changed, read in one slice
+        window = self.tm.read_window(self.tm.head - 6, 13)
+        for i, (_, text) in enumerate(self.tape_cells):
+            sym = window[i]
+            if sym != self.last_tape[i]:
+                self.tape.itemconfig(text, text=sym)
+                self.last_tape[i] = sym
 
         # Info
         if self.tm.halted:
@@ -313,13 +356,21 @@ class GUI:
                 fg="green" if self.tm.accepted else "red"
             )
         else:
-            self.info.config(text=f"State: {self.tm.state} | Steps: {self.tm.steps}")
-
-        # Diagram animation
-        for s in self.state_coords:
-            fill = "yellow" if s==self.tm.state else "lightgreen" if s in self.tm.final_states else "white"
-            width = 4 if s==self.tm.state else 2
-            self.diagram.itemconfig(self.diagram.find_withtag(s), fill=fill, width=width)
+            self.info.config(text=f"State: {self.tm.state} | Steps: {self.tm.step_count}")
+
+        # Diagram animation: only the previous and the current state change,
+        # except on a freshly laid out diagram where every state is painted
+        state = self.tm.state
+        if state != self.last_state:
+            final = self.tm.final_states
+            repaint = self.state_ovals if self.last_state is None else (self.last_state,)
+            for s in repaint:
+                fill = FILL_FINAL if s in final else FILL_STATE
+                self.diagram.itemconfig(self.state_ovals[s], fill=fill, width=2)
+            self.diagram.itemconfig(self.state_ovals[state], fill=FILL_ACTIVE, width=4)
+            self.last_state = state
+
+        self._dirty = False
 
 # ==================================================
 # START